@@ -2,10 +2,12 @@
 # -*- coding: utf-8 -*-
 """Random vibration theory (RVT) based motions."""
 
+import functools
+
+import numba
 import numpy as np
 
 from scipy.stats import linregress
-from scipy.interpolate import interp1d
 
 from . import peak_calculators
 
@@ -81,21 +83,27 @@ def calc_sdof_tf(freqs, osc_freq, osc_damping):
     ----------
     freqs : array_like
         Frequencies at which the transfer function should be calculated  (Hz).
-    osc_freq : float
-        Frequency of the oscillator (Hz).
+    osc_freq : float or array_like
+        Frequency of the oscillator (Hz). If an array of frequencies is
+        provided, then transfer functions are computed for each oscillator.
     osc_damping : float
         Fractional damping of the oscillator (decimal).
 
     Returns
     -------
     :class:`numpy.ndarray`
-        Complex valued transfer function.
+        Complex valued transfer function. If `osc_freq` is an array, then the
+        shape is ``(len(osc_freq), len(freqs))``.
 
     """
     freqs = np.asarray(freqs)
-    return (
-        -osc_freq ** 2. /
-        (freqs ** 2 - osc_freq ** 2 - 2.j * osc_damping * osc_freq * freqs))
+    osc_freq = np.asarray(osc_freq)
+    if osc_freq.ndim:
+        # Broadcast the oscillator frequencies across rows
+        osc_freq = osc_freq[:, np.newaxis]
+    osc_freq_sqr = osc_freq * osc_freq
+    return (-osc_freq_sqr / (freqs * freqs - osc_freq_sqr -
+                             2.j * osc_damping * osc_freq * freqs))
 
 
 def calc_stress_drop(magnitude):
@@ -103,16 +111,16 @@ def calc_stress_drop(magnitude):
 
     Parameters
     ----------
-    magnitude : float
+    magnitude : float or array_like
          Moment magnitude of the stress drop.
 
     Returns
     -------
-    stress_drop : float
+    stress_drop : float or :class:`numpy.ndarray`
         Stress drop (bars).
 
     """
-    return 10 ** (3.45 - 0.2 * max(magnitude, 5.))
+    return 10 ** (3.45 - 0.2 * np.maximum(magnitude, 5.))
 
 
 def calc_geometric_spreading(dist, params):
@@ -120,31 +128,86 @@ def calc_geometric_spreading(dist, params):
 
     Parameters
     ----------
-    dist : float
+    dist : float or array_like
         Closest distance to the rupture surface (km).
     params : List[(float,Optional[float])]
         List of (slope, limit) tuples that define the attenuation. For an
         infinite distance use `None`.  For example, [(1, `None`)] would provide
-        for 1/R geometric spreading to an infinite distance.
+        for 1/R geometric spreading to an infinite distance. The limits must
+        be increasing.
 
     Returns
     -------
-    coeff : float
-        Geometric spreading coefficient.
+    coeff : float or :class:`numpy.ndarray`
+        Geometric spreading coefficient. An array is returned if `dist` is an
+        array.
 
     """
-    initial = 1
-    coeff = 1
+    dist = np.asarray(dist, dtype=float)
+    initial = np.ones_like(dist)
+    coeff = np.ones_like(dist)
     for slope, limit in params:
         # Compute the distance limited by the maximum distance of the slope.
-        _dist = min(dist, limit) if limit else dist
+        # Segments beyond the distance contribute a factor of one.
+        _dist = np.minimum(dist, limit) if limit else dist
         coeff *= (initial / _dist) ** slope
-        if _dist < dist:
-            initial = _dist
+        initial = _dist
+
+    return coeff[()]
+
+
+# Cached to avoid recompiling within each multiprocessing worker
+@numba.njit(cache=True)
+def _calc_vanmarcke_fourier_amps(duration, osc_freqs, osc_accels, osc_damping,
+                                 peak_factor):
+    """Recurrence of the Vanmarcke Fourier amplitude estimate.
+
+    See :meth:`CompatibleRvtMotion._estimate_fourier_amps`.
+
+    Parameters
+    ----------
+    duration : float
+        Duration of the ground motion (sec).
+    osc_freqs : :class:`numpy.ndarray`
+        Oscillator frequencies in increasing order (Hz).
+    osc_accels : :class:`numpy.ndarray`
+        Psuedo-spectral accelerations of the oscillator (g).
+    osc_damping : float
+        Fractional damping of the oscillator (dec).
+    peak_factor : float
+        Assumed peak factor.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        acceleration Fourier amplitude values at `osc_freqs`.
+
+    """
+    fa_sqr_prev = 0.
+    total = 0.
+    sdof_factor = np.pi / (4. * osc_damping) - 1.
+    pf_factor = 2 * peak_factor * peak_factor
+    fourier_amps = np.empty_like(osc_freqs)
+    for i in range(osc_freqs.shape[0]):
+        osc_freq = osc_freqs[i]
+        osc_accel = osc_accels[i]
+        # TODO simplify equation and remove duration
+        fa_sqr_cur = (
+            ((duration * osc_accel * osc_accel) / pf_factor - total) /
+            (osc_freq * sdof_factor))
+
+        if fa_sqr_cur < 0:
+            fourier_amps[i] = fourier_amps[i - 1]
+            fa_sqr_cur = fourier_amps[i] * fourier_amps[i]
         else:
-            break
+            fourier_amps[i] = np.sqrt(fa_sqr_cur)
 
-    return coeff
+        if i == 0:
+            total = fa_sqr_cur * osc_freq / 2.
+        else:
+            total += ((fa_sqr_cur - fa_sqr_prev) / 2 *
+                      (osc_freq - osc_freqs[i - 1]))
+    return fourier_amps
 
 
 class RvtMotion(object):
@@ -177,13 +240,16 @@ class RvtMotion(object):
                  peak_calculator=None,
                  calc_kwds=None):
         """Initialize the class."""
-        self._freqs = freqs
+        self._freqs = None
+        self._freqs_sqr = None
         self._fourier_amps = fourier_amps
         self._duration = duration
 
-        if self._freqs is not None:
-            self._freqs, self._fourier_amps = sort_increasing(
-                self._freqs, self._fourier_amps)
+        if freqs is not None:
+            freqs, fourier_amps = sort_increasing(freqs, self._fourier_amps)
+            # Reversed inputs are views with negative strides
+            self._fourier_amps = np.ascontiguousarray(fourier_amps)
+            self._set_freqs(freqs)
 
         if isinstance(peak_calculator, peak_calculators.Calculator):
             self.peak_calculator = peak_calculator
@@ -191,6 +257,25 @@ class RvtMotion(object):
             self.peak_calculator = peak_calculators.get_peak_calculator(
                 peak_calculator or DEFAULT_CALC, calc_kwds)
 
+    def _set_freqs(self, freqs):
+        """Set the frequencies and values derived from them.
+
+        Parameters
+        ----------
+        freqs : array_like
+            Frequency array (Hz) in increasing order.
+
+        """
+        freqs = np.asarray(freqs)
+        # Integer frequencies are promoted so that the work buffers, which
+        # share this dtype, can hold the transfer functions. The frequencies
+        # are stored contiguously so that reversed inputs do not leave
+        # strided views in the element-wise loops.
+        self._freqs = np.ascontiguousarray(
+            freqs, dtype=np.result_type(freqs.dtype, np.float32))
+        # Squared frequencies are reused by each oscillator transfer function
+        self._freqs_sqr = np.square(self._freqs)
+
     @property
     def freqs(self):
         """Frequency values (Hz)."""
@@ -211,8 +296,8 @@ class RvtMotion(object):
 
         Parameters
         ----------
-        osc_freq : float
-            Frequency of the oscillator (Hz).
+        osc_freqs : array_like
+            Frequencies of the oscillators (Hz).
         osc_damping : float
             Fractional damping of the oscillator (dec). For example, 0.05 for a
             damping ratio of 5%.
@@ -226,26 +311,98 @@ class RvtMotion(object):
             Peak pseudo-spectral acceleration of the oscillator
 
         """
-        if len(trans_func):
-            tf = np.asarray(trans_func)
-        else:
-            tf = np.ones_like(self.freqs)
+        # Oscillator transfer functions are computed in the precision of the
+        # motion's frequencies
+        osc_freqs = np.atleast_1d(
+            np.asarray(osc_freqs, dtype=self._freqs.dtype))
+
+        return self._calc_osc_accels(
+            osc_freqs, osc_damping,
+            self._calc_sdof_tf_amps(osc_freqs, osc_damping), trans_func)
+
+    def _calc_osc_accels(self,
+                         osc_freqs,
+                         osc_damping,
+                         sdof_tf_amps,
+                         trans_func=[]):
+        """Pseudo-acceleration spectral response from transfer functions.
 
-        resp = np.array([
-            self.calc_peak(
-                tf * calc_sdof_tf(self.freqs, of, osc_damping),
-                osc_freq=of,
-                osc_damping=osc_damping,
-                site_tf=trans_func) for of in osc_freqs
-        ])
+        Parameters
+        ----------
+        osc_freqs : :class:`numpy.ndarray`
+            Frequencies of the oscillators (Hz).
+        osc_damping : float
+            Fractional damping of the oscillator (dec).
+        sdof_tf_amps : :class:`numpy.ndarray`
+            Amplitude of the oscillator transfer functions from
+            :meth:`_calc_sdof_tf_amps` for the current frequencies.
+        trans_func : array_like, optional
+            Transfer function to be applied to motion prior calculation of the
+            oscillator response.
 
-        of = 100
-        peak, pf = self.peak_calculator(
-            self._duration, self._freqs, self._fourier_amps *
-            np.abs(calc_sdof_tf(self.freqs, of, osc_damping)))
+        Returns
+        -------
+        spec_accels : :class:`numpy.ndarray`
+            Peak pseudo-spectral acceleration of the oscillator
+
+        """
+        fourier_amps = sdof_tf_amps * self._fourier_amps
+        if len(trans_func):
+            fourier_amps *= np.abs(trans_func)
+
+        resp, _ = self.peak_calculator.calc_peaks(
+            self._duration,
+            self._freqs,
+            fourier_amps,
+            osc_freqs,
+            osc_damping=osc_damping,
+            site_tf=trans_func)
 
         return resp
 
+    def _calc_sdof_tf_amps(self, osc_freqs, osc_damping):
+        """Amplitude of the oscillator transfer functions.
+
+        The transfer functions only depend on the frequencies of the motion
+        and the oscillators, and not on the Fourier amplitudes. Callers that
+        repeatedly evaluate the same oscillators, such as the iterations of
+        :class:`CompatibleRvtMotion`, compute them once and pass them to
+        :meth:`_calc_osc_accels`.
+
+        Parameters
+        ----------
+        osc_freqs : :class:`numpy.ndarray`
+            Frequencies of the oscillators (Hz).
+        osc_damping : float
+            Fractional damping of the oscillator (dec).
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            Absolute value of the transfer functions with shape
+            ``(n_osc, n_freq)``. The array should not be modified.
+
+        """
+        # Amplitude of the oscillator transfer functions computed for all
+        # oscillators at once, shape: (n_osc, n_freq)
+        _osc_freqs = osc_freqs[:, np.newaxis]
+        osc_freqs_sqr = np.square(_osc_freqs)
+        # Magnitude of the complex denominator of :func:`calc_sdof_tf`,
+        # computed from the real and imaginary parts to avoid complex
+        # temporaries. Both parts are evaluated in-place and the real part's
+        # buffer is reused for the result.
+        shape = (osc_freqs.size, self._freqs.size)
+        tf_amps = np.empty(shape, dtype=self._freqs.dtype)
+        work = np.empty(shape, dtype=self._freqs.dtype)
+        np.subtract(self._freqs_sqr, osc_freqs_sqr, out=tf_amps)
+        np.multiply(_osc_freqs, self._freqs, out=work)
+        work *= 2. * osc_damping
+        np.hypot(tf_amps, work, out=tf_amps)
+        np.divide(osc_freqs_sqr, tf_amps, out=tf_amps)
+        tf_amps.flags.writeable = False
+
+        return tf_amps
+
     def calc_peak(self, transfer_func=None, **kwds):
         """Compute the peak response.
 
@@ -314,6 +471,200 @@ class RvtMotion(object):
         return atten, r_value ** 2, freqs, fitted
 
 
+# Default parameters from Campbell (2003) for the Western United States
+# ('wna') and the Central and Eastern United States ('cena'). The default
+# stress drop is provided by :func:`_calc_default_stress_drop`.
+REGION_PARAMS = np.rec.fromrecords(
+    [
+        ('wna', 3.5, 2.8, 180., 0.45, 0.04),
+        ('cena', 3.6, 2.8, 680., 0.36, 0.006),
+    ],
+    names=('region,shear_velocity,density,path_atten_coeff,'
+           'path_atten_power,site_atten'))
+
+# Piece-wise geometric spreading model, see :func:`calc_geometric_spreading`
+GEOMETRIC_SPREADING = {
+    'wna': [(1, 40), (0.5, None)],
+    'cena': [(1, 70), (0, 130), (0.5, None)],
+}
+
+# Crustal amplification from Campbell (2003) using the log-frequency and the
+# amplification based on a quarter-wave length approximation
+SITE_AMPS = {
+    'wna': (
+        np.log([
+            0.01, 0.09, 0.16, 0.51, 0.84, 1.25, 2.26, 3.17, 6.05, 16.60, 61.20,
+            100.00
+        ]),
+        np.array([
+            1.00, 1.10, 1.18, 1.42, 1.58, 1.74, 2.06, 2.25, 2.58, 3.13, 4.00,
+            4.40
+        ]),
+    ),
+    'cena': (
+        np.log([
+            0.01, 0.10, 0.20, 0.30, 0.50, 0.90, 1.25, 1.80, 3.00, 5.30, 8.00,
+            14.00, 30.00, 60.00, 100.00
+        ]),
+        np.array([
+            1.00, 1.02, 1.03, 1.05, 1.07, 1.09, 1.11, 1.12, 1.13, 1.14, 1.15,
+            1.15, 1.15, 1.15, 1.15
+        ]),
+    ),
+}
+
+
+def _get_region_params(region):
+    """Parameters of a region from :data:`REGION_PARAMS`.
+
+    Parameters
+    ----------
+    region : str
+        Region either 'cena' or 'wna'.
+
+    Returns
+    -------
+    :class:`numpy.record`
+        region parameters.
+
+    """
+    return REGION_PARAMS[REGION_PARAMS.region == region][0]
+
+
+def _calc_default_stress_drop(region, magnitude):
+    """Default stress drop of a region.
+
+    Parameters
+    ----------
+    region : str
+        Region either 'cena' or 'wna'.
+    magnitude : float or array_like
+        Moment magnitude of the event.
+
+    Returns
+    -------
+    stress_drop : float or :class:`numpy.ndarray`
+        Stress drop (bars). For 'cena' the stress drop is computed by
+        :func:`calc_stress_drop`, while for 'wna' it is 100 bars.
+
+    """
+    if region == 'cena':
+        return calc_stress_drop(magnitude)
+    else:
+        return np.full_like(magnitude, 100., dtype=float)[()]
+
+
+@functools.lru_cache(maxsize=16)
+def _calc_grid_terms(freqs_bytes, dtype, region, path_atten_power):
+    """Terms of the source theory model that only depend on the frequencies.
+
+    Typically, the same frequencies are used for many motions. The terms are
+    cached for each frequency grid, which avoids repeating the non-integer
+    power and the interpolation of the crustal amplification in log-frequency.
+
+    Parameters
+    ----------
+    freqs_bytes : bytes
+        Raw data of the frequencies (Hz) used as the cache key.
+    dtype : :class:`numpy.dtype`
+        Type of the frequencies.
+    region : str
+        Region of the crustal amplification in :data:`SITE_AMPS`.
+    path_atten_power : float
+        Frequency exponent of the path attenuation.
+
+    Returns
+    -------
+    freqs_pow : :class:`numpy.ndarray`
+        Frequencies raised to `path_atten_power`.
+    site_amp : :class:`numpy.ndarray`
+        Crustal amplification. Outside of the table, the first and last values
+        are used.
+
+    """
+    freqs = np.frombuffer(freqs_bytes, dtype=dtype)
+    site_amp_ln_freqs, site_amp_values = SITE_AMPS[region]
+    terms = (
+        np.power(freqs, path_atten_power),
+        # Linear interpolation in log-frequency
+        np.interp(np.log(freqs), site_amp_ln_freqs, site_amp_values),
+    )
+    for term in terms:
+        term.flags.writeable = False
+    return terms
+
+
+def _calc_fourier_amps(freqs, freqs_sqr, params, region, seismic_moment,
+                       corner_freq, hypo_distance, geo_atten):
+    """Single-corner source theory acceleration Fourier amplitudes.
+
+    The event terms may either be scalars, or column vectors with shape
+    ``(n_events, 1)`` that are broadcast against `freqs` to compute the
+    Fourier amplitudes of multiple events at once.
+
+    Parameters
+    ----------
+    freqs : :class:`numpy.ndarray`
+        Frequencies (Hz).
+    freqs_sqr : :class:`numpy.ndarray`
+        Squared frequencies (Hz²).
+    params : object
+        Crustal parameters with the attributes: `shear_velocity`, `density`,
+        `path_atten_coeff`, `path_atten_power`, and `site_atten`.
+    region : str
+        Region of the crustal amplification in :data:`SITE_AMPS`.
+    seismic_moment : float or :class:`numpy.ndarray`
+        Seismic moment (dyne-cm).
+    corner_freq : float or :class:`numpy.ndarray`
+        Corner frequency (Hz).
+    hypo_distance : float or :class:`numpy.ndarray`
+        Hypocentral distance (km).
+    geo_atten : float or :class:`numpy.ndarray`
+        Geometric spreading coefficient.
+
+    Returns
+    -------
+    fourier_amps : :class:`numpy.ndarray`
+        acceleration Fourier amplitudes (g-sec).
+
+    """
+    # Conversion factor to convert from dyne-cm into gravity-sec
+    conv = 1.e-20 / 980.7
+    # Scalar portion of the model, which combines the source constant,
+    # the seismic moment, the geometric spreading, and the conversion from
+    # displacement to acceleration
+    const = (0.55 * 2.) / (np.sqrt(2.) * 4. * np.pi * params.density *
+                           params.shear_velocity ** 3.)
+    scale = (conv * (4. * np.pi * np.pi) * const * seismic_moment * geo_atten)
+
+    freqs_pow, site_amp = _calc_grid_terms(
+        freqs.tobytes(), freqs.dtype, region, float(params.path_atten_power))
+
+    # The path and site attenuation are combined into a single exponential,
+    # exp(-π f (R / (Q(f) β) + κ)), and evaluated in-place within one buffer.
+    path_atten = np.multiply(freqs_pow,
+                             params.path_atten_coeff * params.shear_velocity)
+    fourier_amps = np.divide(hypo_distance, path_atten)
+    fourier_amps += params.site_atten
+    np.multiply(fourier_amps, freqs, out=fourier_amps)
+    fourier_amps *= -np.pi
+    np.exp(fourier_amps, out=fourier_amps)
+
+    # Source component, f² / (1 + (f / f_c)²), where f² is from the conversion
+    # to acceleration
+    source_comp = np.divide(freqs, corner_freq)
+    np.square(source_comp, out=source_comp)
+    source_comp += 1.
+    np.divide(freqs_sqr, source_comp, out=source_comp)
+    fourier_amps *= source_comp
+
+    # Site amplification
+    fourier_amps *= site_amp
+
+    fourier_amps *= scale
+    return fourier_amps
+
+
 class SourceTheoryMotion(RvtMotion):
     """Single-corner source theory model.
 
@@ -365,67 +716,28 @@ class SourceTheoryMotion(RvtMotion):
         self.distance = distance
         self.region = peak_calculators.get_region(region)
 
-        if self.region == 'wna':
-            # Default parameters for the WUS from Campbell (2003)
-            self.shear_velocity = 3.5
-            self.path_atten_coeff = 180.
-            self.path_atten_power = 0.45
-            self.density = 2.8
-            self.site_atten = 0.04
+        # Default parameters from Campbell (2003)
+        params = _get_region_params(self.region)
+        self.shear_velocity = float(params.shear_velocity)
+        self.density = float(params.density)
+        self.path_atten_coeff = float(params.path_atten_coeff)
+        self.path_atten_power = float(params.path_atten_power)
+        self.site_atten = float(params.site_atten)
 
-            self.geometric_spreading = [(1, 40), (0.5, None)]
-
-            if stress_drop:
-                self.stress_drop = stress_drop
-            else:
-                self.stress_drop = 100.
-
-            # Crustal amplification from Campbell (2003) using the
-            # log-frequency and the amplification based on a quarter-wave
-            # length approximation
-            self.site_amp = interp1d(
-                np.log([
-                    0.01, 0.09, 0.16, 0.51, 0.84, 1.25, 2.26, 3.17, 6.05,
-                    16.60, 61.20, 100.00
-                ]), [
-                    1.00, 1.10, 1.18, 1.42, 1.58, 1.74, 2.06, 2.25, 2.58, 3.13,
-                    4.00, 4.40
-                ],
-                bounds_error=False)
-        elif self.region == 'cena':
-            # Default parameters for the CEUS from Campbell (2003)
-            self.shear_velocity = 3.6
-            self.density = 2.8
-            self.path_atten_coeff = 680.
-            self.path_atten_power = 0.36
-            self.site_atten = 0.006
-
-            self.geometric_spreading = [(1, 70), (0, 130), (0.5, None)]
-
-            if stress_drop:
-                self.stress_drop = stress_drop
-            else:
-                self.stress_drop = calc_stress_drop(magnitude)
-
-            # Crustal amplification from Campbell (2003) using the
-            # log-frequency and the amplification based on a quarter-wave
-            # length approximation
-            self.site_amp = interp1d(
-                np.log([
-                    0.01, 0.10, 0.20, 0.30, 0.50, 0.90, 1.25, 1.80, 3.00, 5.30,
-                    8.00, 14.00, 30.00, 60.00, 100.00
-                ]), [
-                    1.00, 1.02, 1.03, 1.05, 1.07, 1.09, 1.11, 1.12, 1.13, 1.14,
-                    1.15, 1.15, 1.15, 1.15, 1.15
-                ],
-                bounds_error=False)
+        self.geometric_spreading = list(GEOMETRIC_SPREADING[self.region])
 
+        if stress_drop:
+            self.stress_drop = stress_drop
         else:
-            raise NotImplementedError
+            self.stress_drop = _calc_default_stress_drop(
+                self.region, magnitude)
 
         # Depth to rupture
         self.depth = depth
         self.hypo_distance = np.sqrt(self.distance ** 2. + self.depth ** 2.)
+        # Geometric spreading only depends on the hypocentral distance
+        self._geo_atten = calc_geometric_spreading(self.hypo_distance,
+                                                   self.geometric_spreading)
 
         # Constants
         self.seismic_moment = 10. ** (1.5 * (self.magnitude + 10.7))
@@ -433,6 +745,15 @@ class SourceTheoryMotion(RvtMotion):
                             (self.stress_drop / self.seismic_moment)
                             ** (1. / 3.))
 
+    @property
+    def site_amp(self):
+        """Crustal amplification as a function of natural log frequency.
+
+        Values beyond the tabulated range are held at the end points.
+        """
+        ln_freqs, values = SITE_AMPS[self.region]
+        return functools.partial(np.interp, xp=ln_freqs, fp=values)
+
     def calc_duration(self):
         """Compute the duration by combination of source and path.
 
@@ -480,49 +801,112 @@ class SourceTheoryMotion(RvtMotion):
 
         """
         if freqs is None:
-            self._freqs = log_spaced_values(0.05, 200.)
+            self._set_freqs(log_spaced_values(0.05, 200.))
         else:
-            self._freqs, = sort_increasing(np.asarray(freqs))
+            self._set_freqs(*sort_increasing(np.asarray(freqs)))
 
         self._duration = self.calc_duration()
 
-        # Model component
-        const = (0.55 * 2.) / (np.sqrt(2.) * 4. * np.pi * self.density *
-                               self.shear_velocity ** 3.)
-        source_comp = (const * self.seismic_moment /
-                       (1. + (self._freqs / self.corner_freq) ** 2.))
+        self._fourier_amps = _calc_fourier_amps(
+            self._freqs, self._freqs_sqr, self, self.region,
+            self.seismic_moment, self.corner_freq, self.hypo_distance,
+            self._geo_atten)
+
+    @classmethod
+    def calc_fourier_amps_batch(cls,
+                                magnitudes,
+                                distances,
+                                region,
+                                freqs=None,
+                                stress_drops=None,
+                                depth=8):
+        """Compute the acceleration Fourier amplitudes of multiple events.
+
+        The Fourier amplitudes of all events are computed together by
+        broadcasting the event terms across the frequencies, which avoids the
+        creation of a :class:`SourceTheoryMotion` for each event.
 
-        # Path component
-        path_atten = (self.path_atten_coeff * self._freqs
-                      ** self.path_atten_power)
-        geo_atten = calc_geometric_spreading(self.hypo_distance,
-                                             self.geometric_spreading)
+        Parameters
+        ----------
+        magnitudes : array_like
+            Moment magnitudes of the events.
+        distances : array_like
+            Epicentral distances (km).
+        region : str
+            Region for the parameters. Either 'cena' for Central and Eastern
+            North America, or 'wna' for Western North America.
+        freqs : array_like, optional
+            Frequency range. If no frequency range is specified then
+            :func:`log_spaced_values(0.05, 200.)` is used.
+        stress_drops : array_like, optional
+            Stress drops of the events (bars). If `None`, then the default
+            values of :class:`SourceTheoryMotion` are used.
+        depth : float, optional
+            Hypocenter depth (km).
+
+        Returns
+        -------
+        freqs : :class:`numpy.ndarray`
+            Frequencies (Hz).
+        fourier_amps : :class:`numpy.ndarray`
+            acceleration Fourier amplitudes with shape ``(n_events, n_freq)``.
+
+        """
+        region = peak_calculators.get_region(region)
+        params = _get_region_params(region)
+
+        if freqs is None:
+            freqs = log_spaced_values(0.05, 200.)
+        else:
+            freqs, = sort_increasing(np.asarray(freqs))
+
+        magnitudes, distances = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(magnitudes, dtype=float)),
+            np.atleast_1d(np.asarray(distances, dtype=float)))
+
+        if stress_drops is not None:
+            stress_drops = np.broadcast_to(stress_drops, magnitudes.shape)
+        else:
+            stress_drops = _calc_default_stress_drop(region, magnitudes)
+
+        hypo_distances = np.sqrt(distances ** 2. + depth ** 2.)
+        geo_attens = calc_geometric_spreading(hypo_distances,
+                                              GEOMETRIC_SPREADING[region])
+        seismic_moments = 10. ** (1.5 * (magnitudes + 10.7))
+        corner_freqs = (4.9e6 * params.shear_velocity *
+                        (stress_drops / seismic_moments) ** (1. / 3.))
+
+        # Event terms are column vectors that broadcast across frequency
+        fourier_amps = _calc_fourier_amps(
+            freqs, freqs * freqs, params, region,
+            seismic_moments[:, np.newaxis],
+            corner_freqs[:, np.newaxis], hypo_distances[:, np.newaxis],
+            geo_attens[:, np.newaxis])
 
-        path_comp = geo_atten * np.exp(
-            (-np.pi * self._freqs * self.hypo_distance) /
-            (path_atten * self.shear_velocity))
+        return freqs, fourier_amps
 
-        # Site component
-        site_dim = np.exp(-np.pi * self.site_atten * self._freqs)
 
-        ln_freqs = np.log(self._freqs)
-        site_amp = self.site_amp(ln_freqs)
-        if np.any(np.isnan(site_amp)):
-            # Need to extrapolate
-            mask = ln_freqs < self.site_amp.x[0]
-            site_amp[mask] = self.site_amp.y[0]
+@functools.lru_cache(maxsize=32)
+def _boxcar(n, dtype):
+    """Running average window.
 
-            mask = self.site_amp.x[-1] < ln_freqs
-            site_amp[mask] = self.site_amp.y[-1]
+    Parameters
+    ----------
+    n : int
+        Length of the window.
+    dtype : :class:`numpy.dtype`
+        Type of the window.
 
-        site_comp = site_amp * site_dim
+    Returns
+    -------
+    window : :class:`numpy.ndarray`
+        Window of equal weights that sum to one. The array is shared between
+        calls and is read-only.
 
-        # Conversion factor to convert from dyne-cm into gravity-sec
-        conv = 1.e-20 / 980.7
-        # Combine the three components and convert from displacement to
-        # acceleration
-        self._fourier_amps = (conv * (2. * np.pi * self._freqs)
-                              ** 2. * source_comp * path_comp * site_comp)
+    """
+    window = np.full(n, 1. / n, dtype=dtype)
+    window.flags.writeable = False
+    return window
 
 
 class CompatibleRvtMotion(RvtMotion):
@@ -542,7 +926,8 @@ class CompatibleRvtMotion(RvtMotion):
                  event_kwds=None,
                  window_len=None,
                  peak_calculator=None,
-                 calc_kwds=None):
+                 calc_kwds=None,
+                 dtype=np.float64):
         """Initialize the motion.
 
         Parameters
@@ -575,12 +960,21 @@ class CompatibleRvtMotion(RvtMotion):
         calc_kwds : dict, optional
             Keywords to be passed during the creation the peak calculator.
             These keywords are only required for some peak calculators.
+        dtype : :class:`numpy.dtype`, optional
+            Floating point type of the frequencies and Fourier amplitudes used
+            within the iterations. Default is `numpy.float64`. Using
+            `numpy.float32` halves the memory traffic of the oscillator
+            transfer functions, while the spectral moments and the fit are
+            still computed in double precision.
 
         """
         super().__init__(peak_calculator=peak_calculator, calc_kwds=calc_kwds)
 
+        osc_freqs = np.asarray(osc_freqs, dtype=dtype)
+        # Provided order of the oscillator frequencies
+        reverse = osc_freqs[0] > osc_freqs[-1]
         osc_freqs, osc_accels_target = sort_increasing(
-            np.asarray(osc_freqs), np.asarray(osc_accels_target))
+            osc_freqs, np.asarray(osc_accels_target, dtype=dtype))
 
         if duration:
             self._duration = duration
@@ -594,17 +988,18 @@ class CompatibleRvtMotion(RvtMotion):
         # The frequency needs to be extended to account for the fact that the
         # oscillator transfer function has a width. The number of frequencies
         # depends on the range of frequencies provided.
-        self._freqs = log_spaced_values(osc_freqs[0] / 2., 2. * osc_freqs[-1])
+        self._set_freqs(
+            log_spaced_values(osc_freqs[0] / 2.,
+                              2. * osc_freqs[-1]).astype(dtype))
         self._fourier_amps = np.empty_like(self._freqs)
 
         # Indices of the first and last point with the range of the provided
         # response spectra
-        indices = np.argwhere((osc_freqs[0] < self._freqs) & (self._freqs <
-                                                              osc_freqs[-1]))
-        first = indices[0, 0]
+        mask = (osc_freqs[0] < self._freqs) & (self._freqs < osc_freqs[-1])
+        first = mask.argmax()
         # last is extend one past the usable range to allow use of first:last
         # notation
-        last = indices[-1, 0] + 1
+        last = len(mask) - mask[::-1].argmax()
         log_freqs = np.log(self._freqs)
         log_osc_freqs = np.log(osc_freqs)
 
@@ -612,29 +1007,28 @@ class CompatibleRvtMotion(RvtMotion):
             np.interp(log_freqs[first:last], log_osc_freqs,
                       np.log(fourier_amps)))
 
+        # The extrapolation is linear in log-space from the first and last two
+        # points within the range. The log-frequency offsets of the
+        # extrapolated points from the anchor point are fixed, so only the
+        # slopes are computed within the iterations.
+        extraps = []
+        # Lower tail from the first two points, and the upper tail from the
+        # last two points in the range
+        for anchor, sl in [(first, slice(0, first)),
+                           (last - 2, slice(last, None))]:
+            extraps.append((anchor, sl, log_freqs[sl] - log_freqs[anchor],
+                            log_freqs[anchor + 1] - log_freqs[anchor]))
+
         def extrapolate():
             """Extrapolate the first and last value of FAS."""
-
-            def _extrap(freq, freqs, fourier_amps, max_slope=None):
-                # Extrapolation is performed in log-space using the first and
-                # last two points
-                xi = np.log(freq)
-                x = np.log(freqs)
-                y = np.log(fourier_amps)
-                slope = (y[1] - y[0]) / (x[1] - x[0])
-                if max_slope:
-                    slope = min(slope, max_slope)
-
-                return np.exp(slope * (xi - x[0]) + y[0])
-
-            # Update the first point using the second and third points
-            self._fourier_amps[0:first] = _extrap(
-                self._freqs[0:first], self._freqs[first:first + 2],
-                self._fourier_amps[first:first + 2], None)
-            # Update the last point using the third- and second-to-last points
-            self._fourier_amps[last:] = _extrap(
-                self._freqs[last:], self._freqs[last - 2:last],
-                self._fourier_amps[last - 2:last], None)
+            for anchor, sl, offsets, step in extraps:
+                fa_anchor = self._fourier_amps[anchor]
+                slope = np.log(self._fourier_amps[anchor + 1] /
+                               fa_anchor) / step
+                tail = self._fourier_amps[sl]
+                np.multiply(offsets, slope, out=tail)
+                np.exp(tail, out=tail)
+                tail *= fa_anchor
 
         extrapolate()
 
@@ -646,12 +1040,43 @@ class CompatibleRvtMotion(RvtMotion):
         max_iterations = 30
         tolerance = 5e-6
 
-        osc_accels = self.calc_osc_accels(osc_freqs, osc_damping)
+        # The oscillator transfer functions only depend on the frequencies,
+        # which are fixed during the iterations
+        sdof_tf_amps = self._calc_sdof_tf_amps(osc_freqs, osc_damping)
+        osc_accels = self._calc_osc_accels(osc_freqs, osc_damping,
+                                           sdof_tf_amps)
+
+        # The log of the target is constant, which leaves only the log of the
+        # computed response to be evaluated within the iterations.
+        log_osc_accels_target = np.log(osc_accels_target)
+        log_ratio = np.empty_like(log_osc_accels_target)
 
         # Smoothing operator
         if window_len:
-            window = np.ones(window_len, 'd')
-            window /= window.sum()
+            window = _boxcar(window_len, np.dtype(dtype))
+
+        # Wide smoothing windows are applied by FFT based convolution, which
+        # scales with the number of frequencies rather than with the number
+        # of frequencies times the window length. The transform of the window
+        # is only computed once.
+        count = self._freqs.size
+        use_fft = bool(window_len) and 16 <= window_len <= count
+        if use_fft:
+            n_fft = 2 ** int(np.ceil(np.log2(count + window_len - 1)))
+            window_fft = np.fft.rfft(window, n_fft)
+            # Start of the centered portion of the full convolution, which
+            # matches the 'same' mode of `np.convolve`
+            offset = (window_len - 1) // 2
+
+        def smooth():
+            """Apply a running average to the FAS."""
+            if use_fft:
+                self._fourier_amps = np.fft.irfft(
+                    np.fft.rfft(self._fourier_amps, n_fft) * window_fft,
+                    n_fft)[offset:offset + count].astype(dtype)
+            else:
+                self._fourier_amps = np.convolve(window, self._fourier_amps,
+                                                 'same')
 
         while self.iterations < max_iterations and tolerance < self.rmse:
             # Correct the FAS by the ratio of the target to computed
@@ -659,26 +1084,33 @@ class CompatibleRvtMotion(RvtMotion):
             # frequency range. The first and last points in the FAS are
             # determined through extrapolation.
 
+            np.log(osc_accels, out=log_ratio)
+            np.subtract(log_osc_accels_target, log_ratio, out=log_ratio)
             self._fourier_amps[first:last] *= np.exp(
-                np.interp(log_freqs[first:last], log_osc_freqs,
-                          np.log((osc_accels_target / osc_accels))))
+                np.interp(log_freqs[first:last], log_osc_freqs, log_ratio))
 
             extrapolate()
 
             # Apply a running average to smooth the signal
             if window_len:
-                self._fourier_amps = np.convolve(window, self._fourier_amps,
-                                                 'same')
+                smooth()
 
             # Recompute the response spectrum
-            osc_accels = self.calc_osc_accels(osc_freqs, osc_damping)
+            osc_accels = self._calc_osc_accels(osc_freqs, osc_damping,
+                                               sdof_tf_amps)
 
             # Compute the fit between the target and computed oscillator
             # response
-            self.rmse = np.sqrt(np.mean((osc_accels_target - osc_accels) ** 2))
+            residuals = osc_accels_target - osc_accels
+            self.rmse = np.sqrt(
+                np.mean(residuals * residuals, dtype=np.float64))
 
             self.iterations += 1
 
+        # Response of the final Fourier amplitudes at `osc_freqs` in the
+        # provided order, which is kept to avoid recomputing it
+        self.osc_accels = osc_accels[::-1] if reverse else osc_accels
+
     def _estimate_fourier_amps(self, osc_freqs, osc_accels, osc_damping):
         """Estimate the Fourier amplitudes.
 
@@ -704,27 +1136,10 @@ class CompatibleRvtMotion(RvtMotion):
             specifed by `osc_freqs`.
 
         """
-        # Compute initial value using Vanmarcke methodology.
+        # Compute initial value using Vanmarcke methodology. The recurrence
+        # is sequential and is evaluated by a compiled kernel.
         peak_factor = 2.5
-        fa_sqr_prev = 0.
-        total = 0.
-        sdof_factor = np.pi / (4. * osc_damping) - 1.
-        fourier_amps = np.empty_like(osc_freqs)
-        for i, (osc_freq, osc_accel) in enumerate(zip(osc_freqs, osc_accels)):
-            # TODO simplify equation and remove duration
-            fa_sqr_cur = (
-                ((self.duration * osc_accel ** 2) /
-                 (2 * peak_factor ** 2) - total) / (osc_freq * sdof_factor))
-
-            if fa_sqr_cur < 0:
-                fourier_amps[i] = fourier_amps[i - 1]
-                fa_sqr_cur = fourier_amps[i] ** 2
-            else:
-                fourier_amps[i] = np.sqrt(fa_sqr_cur)
-
-            if i == 0:
-                total = fa_sqr_cur * osc_freq / 2.
-            else:
-                total += ((fa_sqr_cur - fa_sqr_prev) / 2 *
-                          (osc_freq - osc_freqs[i - 1]))
-        return fourier_amps
+        return _calc_vanmarcke_fourier_amps(
+            float(self.duration), np.asarray(osc_freqs, dtype=float),
+            np.asarray(osc_accels, dtype=float), float(osc_damping),
+            peak_factor)
@@ -14,6 +14,7 @@ import pathlib
 import numpy as np
 import numba
 
+from scipy import LowLevelCallable
 from scipy.integrate import quad
 from scipy.interpolate import LinearNDInterpolator
 from scipy.signal import argrelmax
@@ -78,11 +79,12 @@ def _calc_vanmarcke1975_ccdf(n, a):
     num_zero_crossings = args[1]
     bandwidth_eff = args[2]
 
-    return 1 - (1 - np.exp(-(x**2) / 2)) * np.exp(
+    half_x_sqr = x * x / 2
+    return 1 - (1 - np.exp(-half_x_sqr)) * np.exp(
         -1
         * num_zero_crossings
         * (1 - np.exp(-1 * np.sqrt(np.pi / 2) * bandwidth_eff * x))
-        / (np.exp(x**2 / 2) - 1)
+        / (np.exp(half_x_sqr) - 1)
     )
 
 
@@ -120,17 +122,59 @@ def _calc_cartwright_pf(n, a):
 # Force the argtypes to be what quad expects
 _calc_cartwright_pf.ctypes.argtypes = (ctypes.c_int, ctypes.c_double)
 
+# The peak factor integrals are evaluated once per oscillator. Wrapping the
+# integrands as low-level callables here, with the signature that quad
+# expects, avoids quad inspecting and wrapping the ctypes function for every
+# oscillator.
+_integrand_type = ctypes.CFUNCTYPE(
+    ctypes.c_double, ctypes.c_int, ctypes.POINTER(ctypes.c_double)
+)
+_VANMARCKE1975_CCDF = LowLevelCallable(
+    _integrand_type(_calc_vanmarcke1975_ccdf.address)
+)
+_CARTWRIGHT_PF = LowLevelCallable(_integrand_type(_calc_cartwright_pf.address))
+
 
 def calc_moments(freqs, fourier_amps, orders):
+    """Compute the spectral moments of one or more spectra.
 
-    squared_fa = np.square(fourier_amps)
+    The trapezoidal integration is expressed as a matrix product of the
+    squared Fourier amplitudes with the integration weights of each moment,
+    which allows the moments of many spectra to be computed at once.
 
-    # Use trapzoidal integration to compute the requested moments.
-    moments = [
-        2.0 * trapz(freqs, np.power(2 * np.pi * freqs, o) * squared_fa) for o in orders
-    ]
+    Parameters
+    ----------
+    freqs : array_like
+        Frequency of the Fourier amplitude spectrum (Hz)
+    fourier_amps : array_like
+        Amplitude of the Fourier amplitude spectrum. Either a single spectrum
+        with shape ``(n_freq,)``, or multiple spectra with the shape
+        ``(n_spectra, n_freq)``.
+    orders : array_like
+        Orders of the moments.
 
-    return moments
+    Returns
+    -------
+    moments : :class:`numpy.ndarray`
+        Spectral moments with the shape ``(n_orders,)`` or
+        ``(n_spectra, n_orders)``.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+
+    # Weights of the trapezoidal rule
+    half_widths = np.diff(freqs) / 2
+    weights = np.zeros_like(freqs)
+    weights[:-1] += half_widths
+    weights[1:] += half_widths
+
+    # Integration weights of each moment, shape: (n_freq, n_orders)
+    weights = (
+        2.0
+        * weights[:, np.newaxis]
+        * np.power(2 * np.pi * freqs[:, np.newaxis], np.asarray(orders))
+    )
+
+    return np.square(fourier_amps) @ weights
 
 
 class SquaredSpectrum(object):
@@ -144,12 +188,15 @@ class SquaredSpectrum(object):
         Frequency of the Fourier amplitude spectrum (Hz)
     fourier_amps : array_like
         Amplitude of the Fourier amplitude spectrum.
+    moments : dict, optional
+        Previously computed spectral moments keyed by the order.
     """
 
-    def __init__(self, freqs, fourier_amps):
+    def __init__(self, freqs, fourier_amps, moments=None):
         self._freqs = freqs
-        self._squared_fa = np.square(fourier_amps)
-        self._moments = {}
+        self._fourier_amps = fourier_amps
+        self._squared_fa = None
+        self._moments = dict(moments or {})
 
     def moment(self, num):
         """Compute the spectral moments.
@@ -166,6 +213,8 @@ class SquaredSpectrum(object):
         try:
             moment = self._moments[num]
         except KeyError:
+            if self._squared_fa is None:
+                self._squared_fa = np.square(self._fourier_amps)
             moment = 2.0 * trapz(
                 self._freqs, np.power(2 * np.pi * self._freqs, num) * self._squared_fa
             )
@@ -185,6 +234,10 @@ class Calculator(object):
 
     _MIN_ZERO_CROSSINGS = 1.33
 
+    # Orders of the spectral moments used by the calculators, which are
+    # computed together by :meth:`calc_peaks`
+    _MOMENT_ORDERS = (0, 1, 2, 4)
+
     def __init__(self, **kwds):
         """Initialize the object."""
         super().__init__()
@@ -234,7 +287,74 @@ class Calculator(object):
             associated peak factor.
 
         """
-        self._spectrum = SquaredSpectrum(freqs, fourier_amps)
+        return self._calc_peak(
+            duration, freqs, SquaredSpectrum(freqs, fourier_amps), **kwargs
+        )
+
+    def calc_peaks(self, duration, freqs, fourier_amps, osc_freqs, **kwargs):
+        """Compute the peak response of multiple oscillators.
+
+        The spectral moments of all oscillators are computed at once by
+        :func:`calc_moments`.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of the stationary portion of the ground motion. Typically
+            defined as the duration between the 5% and 75% normalized Arias
+            intensity (sec).
+        freqs : array_like
+            Frequency of the Fourier amplitude spectrum (Hz).
+        fourier_amps : array_like
+             Amplitude of the Fourier amplitude spectra with a single degree
+             of freedom oscillator applied with shape ``(n_osc, n_freq)``.
+             Units are not important.
+        osc_freqs : array_like
+            Frequency of each oscillator (Hz).
+
+        Returns
+        -------
+        max_resps : :class:`numpy.ndarray`
+            expected maximum response of each oscillator.
+        peak_factors : :class:`numpy.ndarray`
+            associated peak factors.
+
+        """
+        moments = calc_moments(freqs, fourier_amps, self._MOMENT_ORDERS)
+
+        max_resps = np.empty(len(osc_freqs))
+        peak_factors = np.empty(len(osc_freqs))
+        for i, osc_freq in enumerate(osc_freqs):
+            spectrum = SquaredSpectrum(
+                freqs, fourier_amps[i], zip(self._MOMENT_ORDERS, moments[i])
+            )
+            max_resps[i], peak_factors[i] = self._calc_peak(
+                duration, freqs, spectrum, osc_freq=osc_freq, **kwargs
+            )
+
+        return max_resps, peak_factors
+
+    def _calc_peak(self, duration, freqs, spectrum, **kwargs):
+        """Compute the peak response of a squared spectrum.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of the stationary portion of the ground motion (sec).
+        freqs : array_like
+            Frequency of the Fourier amplitude spectrum (Hz).
+        spectrum : :class:`SquaredSpectrum`
+            Squared spectrum of the response.
+
+        Returns
+        -------
+        max_resp : float
+            expected maximum response.
+        peak_factor : float
+            associated peak factor.
+
+        """
+        self._spectrum = spectrum
 
         peak_factor = self._calc_peak_factor(duration, **kwargs)
 
@@ -366,7 +486,7 @@ class Vanmarcke1975(Calculator):
         # The expected peak factor is computed as the integral of the
         # complementary CDF (1 - CDF(x)).
         peak_factor = quad(
-            _calc_vanmarcke1975_ccdf.ctypes,
+            _VANMARCKE1975_CCDF,
             0,
             np.inf,
             args=(num_zero_crossings, bandwidth_eff),
@@ -621,9 +741,7 @@ class CartwrightLonguetHiggins1956(Calculator):
         # Compute the peak factor by the indefinite integral.
         peak_factor = (
             np.sqrt(2.0)
-            * quad(
-                _calc_cartwright_pf.ctypes, 0, np.inf, args=(num_extrema, bandwidth)
-            )[0]
+            * quad(_CARTWRIGHT_PF, 0, np.inf, args=(num_extrema, bandwidth))[0]
         )
 
         return peak_factor
@@ -676,17 +794,39 @@ class BooreJoyner1984(CartwrightLonguetHiggins1956):
         osc_damping = kwargs.get("osc_damping", None)
 
         if osc_damping and osc_freq:
-            power = 3.0
-            coef = 1.0 / 3.0
-            # This equation was rewritten in Boore and Thompson (2012).
-            foo = 1.0 / (osc_freq * duration)
-            dur_ratio = 1 + 1.0 / (2 * np.pi * osc_damping) * (
-                foo / (1 + coef * foo**power)
-            )
-            duration *= dur_ratio
+            duration *= self._calc_duration_ratio(duration, osc_freq, osc_damping)
 
         return duration
 
+    def _calc_duration_ratio(self, duration, osc_freq, osc_damping):
+        """Compute the ratio of the RMS duration to the ground motion duration.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of the stationary portion of the ground motion. Typically
+            defined as the duration between the 5% and 75% normalized Arias
+            intensity (sec).
+        osc_freq : float or array_like
+            Frequency of the oscillator (Hz).
+        osc_damping : float
+            Fractional damping of the oscillator (dec). For example, 0.05 for
+            a damping ratio of 5%.
+
+        Returns
+        -------
+        dur_ratio : float or :class:`numpy.ndarray`
+            Duration ratio for each oscillator frequency.
+
+        """
+        power = 3.0
+        coef = 1.0 / 3.0
+        # This equation was rewritten in Boore and Thompson (2012).
+        foo = 1.0 / (np.asarray(osc_freq) * duration)
+        return 1 + 1.0 / (2 * np.pi * osc_damping) * (
+            foo / (1 + coef * foo**power)
+        )
+
 
 class LiuPezeshk1999(BooreJoyner1984):
     """Liu and Pezeshk (1999) peak factor.
@@ -731,20 +871,45 @@ class LiuPezeshk1999(BooreJoyner1984):
         osc_freq = kwargs.get("osc_freq", None)
         osc_damping = kwargs.get("osc_damping", None)
         if osc_freq and osc_damping:
-            m0, m1, m2 = self._spectrum.moments(0, 1, 2)
+            duration *= self._calc_duration_ratio(duration, osc_freq, osc_damping)
 
-            power = 2.0
-            coef = np.sqrt(2 * np.pi * (1.0 - (m1 * m1) / (m0 * m2)))
+        return duration
 
-            # Same model as used in Boore and Joyner (1984). This equation was
-            # rewritten in Boore and Thompson (2012).
-            foo = 1.0 / (osc_freq * duration)
-            dur_ratio = 1 + 1.0 / (2 * np.pi * osc_damping) * (
-                foo / (1 + coef * foo**power)
-            )
-            duration *= dur_ratio
+    def _calc_duration_ratio(self, duration, osc_freq, osc_damping):
+        """Compute the ratio of the RMS duration to the ground motion duration.
 
-        return duration
+        The ratio depends on the bandwidth of the spectrum that is currently
+        being evaluated.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of the stationary portion of the ground motion. Typically
+            defined as the duration between the 5% and 75% normalized Arias
+            intensity (sec).
+        osc_freq : float or array_like
+            Frequency of the oscillator (Hz).
+        osc_damping : float
+            Fractional damping of the oscillator (dec). For example, 0.05 for
+            a damping ratio of 5%.
+
+        Returns
+        -------
+        dur_ratio : float or :class:`numpy.ndarray`
+            Duration ratio for each oscillator frequency.
+
+        """
+        m0, m1, m2 = self._spectrum.moments(0, 1, 2)
+
+        power = 2.0
+        coef = np.sqrt(2 * np.pi * (1.0 - (m1 * m1) / (m0 * m2)))
+
+        # Same model as used in Boore and Joyner (1984). This equation was
+        # rewritten in Boore and Thompson (2012).
+        foo = 1.0 / (np.asarray(osc_freq) * duration)
+        return 1 + 1.0 / (2 * np.pi * osc_damping) * (
+            foo / (1 + coef * foo**power)
+        )
 
 
 def _make_bt_interpolator(region, ref):
@@ -841,16 +1006,41 @@ class BooreThompson(object):
         osc_freq = kwargs.get("osc_freq", None)
         osc_damping = kwargs.get("osc_damping", None)
         if osc_freq and osc_damping:
-            c1, c2, c3, c4, c5, c6, c7 = self._COEFS
-
-            foo = 1 / (osc_freq * duration)
-            dur_ratio = (c1 + c2 * (1 - foo**c3) / (1 + foo**c3)) * (
-                1 + c4 / (2 * np.pi * osc_damping) * (foo / (1 + c5 * foo**c6)) ** c7
-            )
-            duration *= dur_ratio
+            duration *= self._calc_duration_ratio(duration, osc_freq, osc_damping)
 
         return duration
 
+    def _calc_duration_ratio(self, duration, osc_freq, osc_damping):
+        """Compute the ratio of the RMS duration to the ground motion duration.
+
+        The ratio does not include the site effects of
+        :class:`WangRathje2018`.
+
+        Parameters
+        ----------
+        duration : float
+            Duration of the stationary portion of the ground motion. Typically
+            defined as the duration between the 5% and 75% normalized Arias
+            intensity (sec).
+        osc_freq : float or array_like
+            Frequency of the oscillator (Hz).
+        osc_damping : float
+            Fractional damping of the oscillator (dec). For example, 0.05 for
+            a damping ratio of 5%.
+
+        Returns
+        -------
+        dur_ratio : float or :class:`numpy.ndarray`
+            Duration ratio for each oscillator frequency.
+
+        """
+        c1, c2, c3, c4, c5, c6, c7 = self._COEFS
+
+        foo = 1 / (np.asarray(osc_freq) * duration)
+        return (c1 + c2 * (1 - foo**c3) / (1 + foo**c3)) * (
+            1 + c4 / (2 * np.pi * osc_damping) * (foo / (1 + c5 * foo**c6)) ** c7
+        )
+
 
 class BooreThompson2012(BooreThompson, BooreJoyner1984):
     """Boore and Thompson (2012) peak factor.
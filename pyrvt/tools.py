@@ -147,7 +147,8 @@ def _calc_fa(target_freqs, damping, method, event):
         osc_damping=damping,
         event_kwds=event_kwds,
         peak_calculator=get_peak_calculator(method, event_kwds))
-    psa_calc = crm.calc_osc_accels(target_freqs, damping)
+    # Response from the last iteration of the compatible motion
+    psa_calc = crm.osc_accels
     return crm, psa_calc
 
 
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
+import pytest
 from numpy.testing import assert_allclose
 
 import pyrvt
@@ -27,7 +28,74 @@ def test_calc_attenuation():
     # fig.savefig('test')
 
 
-def test_compatible_rvt_motion():
+@pytest.mark.parametrize('dist,expected', [
+    (10., 1 / 10.),
+    (70., 1 / 70.),
+    (100., 1 / 70.),
+    (200., 1 / 70. * (130. / 200.) ** 0.5),
+])
+def test_calc_geometric_spreading(dist, expected):
+    params = [(1, 70), (0, 130), (0.5, None)]
+    assert_allclose(
+        pyrvt.motions.calc_geometric_spreading(dist, params), expected)
+
+
+def test_calc_geometric_spreading_array():
+    params = [(1, 70), (0, 130), (0.5, None)]
+    dists = np.array([10., 70., 100., 200.])
+    assert_allclose(
+        pyrvt.motions.calc_geometric_spreading(dists, params),
+        [pyrvt.motions.calc_geometric_spreading(d, params) for d in dists])
+
+
+def test_calc_sdof_tf_broadcast():
+    freqs = np.logspace(-1, 2, 64)
+    osc_freqs = np.array([0.5, 5., 50.])
+
+    tfs = pyrvt.motions.calc_sdof_tf(freqs, osc_freqs, 0.05)
+
+    assert tfs.shape == (osc_freqs.size, freqs.size)
+    for of, tf in zip(osc_freqs, tfs):
+        assert_allclose(tf, pyrvt.motions.calc_sdof_tf(freqs, of, 0.05))
+
+
+def test_rvt_motion_integer_freqs():
+    freqs = np.arange(1, 200)
+    fourier_amps = 1. / freqs
+    osc_freqs = [0.5, 1.5, 10.]
+
+    expected = pyrvt.motions.RvtMotion(
+        freqs.astype(float), fourier_amps, 5.).calc_osc_accels(osc_freqs)
+    actual = pyrvt.motions.RvtMotion(freqs, fourier_amps,
+                                     5.).calc_osc_accels(osc_freqs)
+    assert_allclose(actual, expected)
+
+
+def test_rvt_motion_decreasing_freqs():
+    freqs = np.logspace(2, -1, 64)
+    m = pyrvt.motions.RvtMotion(freqs, 1. / freqs, 5.)
+    assert m.freqs.flags['C_CONTIGUOUS']
+    assert m.fourier_amps.flags['C_CONTIGUOUS']
+    assert_allclose(m.freqs, freqs[::-1])
+
+
+def test_calc_osc_accels_new_freqs():
+    osc_freqs = np.logspace(-1, 2, 20)
+    freqs = np.logspace(-1.5, 2.5, 256)
+
+    m = pyrvt.motions.SourceTheoryMotion(6, 20, 'wna')
+    m.calc_fourier_amps(np.logspace(-1, 2, 64))
+    m.calc_osc_accels(osc_freqs)
+    m.calc_fourier_amps(freqs)
+
+    expected = pyrvt.motions.SourceTheoryMotion(6, 20, 'wna')
+    expected.calc_fourier_amps(freqs)
+    assert_allclose(
+        m.calc_osc_accels(osc_freqs), expected.calc_osc_accels(osc_freqs))
+
+
+@pytest.mark.parametrize('window_len', [None, 5, 32])
+def test_compatible_rvt_motion(window_len):
     # Compute the target from the point source model.
     target = pyrvt.motions.SourceTheoryMotion(
         6.,
@@ -44,9 +112,11 @@ def test_compatible_rvt_motion():
         osc_accels_target,
         duration=target.duration,
         osc_damping=0.05,
+        window_len=window_len,
         peak_calculator=pyrvt.peak_calculators.DerKiureghian1985())
 
     osc_accels_compat = compat.calc_osc_accels(osc_freqs, 0.05)
+    assert_allclose(compat.osc_accels, osc_accels_compat)
 
     # Might be off by a few percent because of difficulties with the inversion.
     assert_allclose(osc_accels_target, osc_accels_compat, rtol=0.03, atol=0.05)
@@ -74,3 +144,56 @@ def test_compatible_rvt_motion():
     # ax.set_yscale('log')
     #
     # fig.savefig('compatible_fas.png', dpi=300)
+
+
+def test_boxcar():
+    window = pyrvt.motions._boxcar(5, np.dtype(np.float32))
+    assert window.dtype == np.float32
+    assert not window.flags.writeable
+    assert_allclose(window.sum(), 1., rtol=1e-6)
+    assert window is pyrvt.motions._boxcar(5, np.dtype(np.float32))
+
+
+def test_compatible_rvt_motion_float32():
+    target = pyrvt.motions.SourceTheoryMotion(6., 20., 'wna')
+    target.calc_fourier_amps(np.logspace(-1.5, 2, 1024))
+
+    osc_freqs = np.logspace(-1, 2, num=50)
+    osc_accels_target = target.calc_osc_accels(osc_freqs, 0.05)
+
+    compat = pyrvt.motions.CompatibleRvtMotion(
+        osc_freqs,
+        osc_accels_target,
+        duration=target.duration,
+        osc_damping=0.05,
+        dtype=np.float32)
+
+    assert compat.freqs.dtype == np.float32
+    assert compat.fourier_amps.dtype == np.float32
+    assert_allclose(osc_accels_target, compat.osc_accels, rtol=0.03, atol=0.05)
+
+
+@pytest.mark.parametrize('region', ['wna', 'cena'])
+def test_calc_fourier_amps_batch(region):
+    magnitudes = [5., 6.5, 7.5]
+    distances = [10., 50., 200.]
+    freqs = np.logspace(-1, 2, 128)
+
+    stm = pyrvt.motions.SourceTheoryMotion
+    _freqs, fourier_amps = stm.calc_fourier_amps_batch(
+        magnitudes, distances, region, freqs)
+
+    assert fourier_amps.shape == (len(magnitudes), len(freqs))
+    for mag, dist, fa in zip(magnitudes, distances, fourier_amps):
+        m = pyrvt.motions.SourceTheoryMotion(mag, dist, region)
+        m.calc_fourier_amps(freqs)
+        assert_allclose(fa, m.fourier_amps)
+
+
+def test_source_theory_site_amp():
+    m = pyrvt.motions.SourceTheoryMotion(6, 20, 'wna')
+    ln_freqs, values = pyrvt.motions.SITE_AMPS['wna']
+    assert_allclose(m.site_amp(ln_freqs), values)
+    # Held at the end points outside of the table
+    assert_allclose(m.site_amp([ln_freqs[0] - 1, ln_freqs[-1] + 1]),
+                    values[[0, -1]])
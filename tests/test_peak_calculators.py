@@ -60,6 +60,48 @@ def test_abbrev(bj84_pc):
     assert_string_equal(bj84_pc.abbrev, 'BJ84')
 
 
+@pytest.mark.parametrize('peak_calculator', [
+    pyrvt.peak_calculators.BooreJoyner1984(),
+    pyrvt.peak_calculators.LiuPezeshk1999(),
+    pyrvt.peak_calculators.BooreThompson2012('wna', 6, 20.),
+    pyrvt.peak_calculators.BooreThompson2015('ena', 6, 20.8),
+])
+def test_duration_ratio(peak_calculator):
+    duration = 5.
+    osc_damping = 0.05
+    osc_freqs = np.logspace(-1, 2, num=20)
+
+    # Liu & Pezeshk (1999) depends on the bandwidth of the spectrum
+    freqs = np.logspace(-1, 2, num=256)
+    peak_calculator._spectrum = pyrvt.peak_calculators.SquaredSpectrum(
+        freqs, np.abs(pyrvt.motions.calc_sdof_tf(freqs, 2., osc_damping)))
+
+    dur_ratios = peak_calculator._calc_duration_ratio(
+        duration, osc_freqs, osc_damping)
+    assert_allclose(dur_ratios, [
+        peak_calculator._calc_duration_rms(
+            duration, osc_freq=of, osc_damping=osc_damping) / duration
+        for of in osc_freqs
+    ])
+    peak_calculator._spectrum = None
+
+
+def test_calc_moments():
+    freqs = np.logspace(-1, 2, num=256)
+    fourier_amps = np.array([
+        np.abs(pyrvt.motions.calc_sdof_tf(freqs, of, 0.05))
+        for of in [0.5, 5., 50.]
+    ])
+    orders = [0, 1, 2, 4]
+
+    moments = pyrvt.peak_calculators.calc_moments(freqs, fourier_amps, orders)
+
+    assert moments.shape == (len(fourier_amps), len(orders))
+    for fa, expected in zip(fourier_amps, moments):
+        spectrum = pyrvt.peak_calculators.SquaredSpectrum(freqs, fa)
+        assert_allclose(spectrum.moments(*orders), expected)
+
+
 @pytest.mark.xfail()
 def test_bt15_out_of_bounds():
     pyrvt.peak_calculators.BooreThompson2012('wna', 9, 100)